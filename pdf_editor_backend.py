@@ -4,161 +4,735 @@ Uses PyPDF2, reportlab, and PIL for real PDF editing
 """
 
 from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.errors import EmptyFileError, PdfReadError
+from PyPDF2.generic import (ArrayObject, DecodedStreamObject, DictionaryObject, EncodedStreamObject,
+                            IndirectObject, NameObject, NumberObject, RectangleObject, StreamObject)
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.colors import HexColor
+from reportlab.lib.rl_accel import fp_str
+from reportlab.lib.utils import ImageReader
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import cached_property, lru_cache
 from io import BytesIO
 from PIL import Image
+import mmap
 import os
+import shutil
+import tempfile
+# pikepdf (qpdf) for serializing the final PDF natively, if installed
+try:
+    import pikepdf
+    HAS_PIKEPDF = True
+except ImportError:
+    HAS_PIKEPDF = False
+
+# The process umask, to give saved files the permissions open() would have
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+@lru_cache(maxsize=256)
+def _hex(color):
+    """Parse a "#rrggbb" colour once; edits tend to reuse a small palette"""
+    return HexColor(color)
+
+
+@lru_cache(maxsize=32)
+def _scaled_image(image_path, mtime, width, height):
+    """Shrink an image to twice its drawn size (in points), returning the encoded bytes.
+
+    Returns None if the image is already small enough to embed as is. Cached per file
+    version and size, so a logo stamped on many pages is only decoded once.
+    """
+    target = (max(1, int(width * 2)), max(1, int(height * 2)))
+    with Image.open(image_path) as img:
+        if img.width <= target[0] and img.height <= target[1]:
+            return None
+        img.thumbnail(target, Image.LANCZOS, reducing_gap=2.0)
+        buf = BytesIO()
+        # Keep transparency (PNG); everything else is embedded as a JPEG
+        if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+            img.save(buf, format='PNG', optimize=True)
+        else:
+            img.convert('RGB').save(buf, format='JPEG', quality=85, optimize=True)
+    return buf.getvalue()
+
+
+@lru_cache(maxsize=32)
+def _check_image(image_path, mtime):
+    """Raise if an image file can't be identified (only its header is read)"""
+    with Image.open(image_path):
+        pass
+
+
+# TrueType fonts registered with reportlab so far, by name
+_REGISTERED_FONTS = set()
+
+
+def _ensure_font(font_name, font_path=None):
+    """Register a TrueType font with reportlab the first time it is used"""
+    if font_path and font_name not in _REGISTERED_FONTS:
+        pdfmetrics.registerFont(TTFont(font_name, font_path))
+        _REGISTERED_FONTS.add(font_name)
+
+
+class _OverlayCanvas(canvas.Canvas):
+    """Canvas that skips setFont calls which wouldn't change the current font"""
+    _current_font = None
+    
+    def setFont(self, psfontname, size, leading=None):
+        font = (psfontname, size, leading)
+        if font != self._current_font:
+            self._current_font = font
+            super().setFont(psfontname, size, leading)
+
+
+# Replay a queued drawing operation onto an overlay canvas
+def _draw_text(can, text, x, y, font_size, color, font_name):
+    can.setFont(font_name, font_size)
+    can.setFillColor(color)
+    can.drawString(x, y, text)
+
+
+def _draw_image(can, image, x, y, width, height):
+    # Only local files drawn at a given size are downscaled; anything else reportlab
+    # accepts (natural size, URLs, file objects, ImageReaders) is drawn as given
+    if (isinstance(image, (str, os.PathLike)) and isinstance(width, (int, float))
+            and isinstance(height, (int, float)) and os.path.isfile(image)):
+        scaled = _scaled_image(os.fspath(image), os.stat(image).st_mtime_ns, width, height)
+        if scaled is not None:
+            image = ImageReader(BytesIO(scaled))
+    can.drawImage(image, x, y, width=width, height=height)
+
+
+def _draw_rectangle(can, x, y, width, height, fill_color, stroke_color, stroke_width):
+    can.setFillColor(fill_color)
+    can.setStrokeColor(stroke_color)
+    can.setLineWidth(stroke_width)
+    can.rect(x, y, width, height, fill=1, stroke=1)
+
+
+def _draw_line(can, x1, y1, x2, y2, color, width):
+    can.setStrokeColor(color)
+    can.setLineWidth(width)
+    can.line(x1, y1, x2, y2)
+
+
+_DRAW = {
+    'text': _draw_text,
+    'image': _draw_image,
+    'rectangle': _draw_rectangle,
+    'line': _draw_line,
+}
+
+
+def _render_overlay(ops, pagesize):
+    """Draw a page's queued operations onto one canvas and return the overlay PDF bytes"""
+    # reportlab assembles the whole document in memory and hands it over in one
+    # piece, so take it directly rather than through a file-like buffer
+    can = _OverlayCanvas(None, pagesize=pagesize)
+    for kind, args in ops:
+        _DRAW[kind](can, *args)
+    return can.getpdfdata()
+
+
+# Rectangles and lines need no fonts or images, so pages with only those edits get
+# their PDF operators appended directly instead of going through a reportlab overlay
+def _pdf_num(value):
+    """Format a number like reportlab's fp_str, without its rounding work for whole numbers"""
+    if type(value) is int:
+        return str(value)
+    if type(value) is float and value.is_integer():
+        return str(int(value))
+    return fp_str(value)
+
+
+@lru_cache(maxsize=256)
+def _rgb(color):
+    """A colour's "r g b" operands, formatted once per colour"""
+    return fp_str(color.red, color.green, color.blue)
+
+
+def _rectangle_ops(x, y, width, height, fill_color, stroke_color, stroke_width):
+    return (f"{_pdf_num(stroke_width)} w {_rgb(fill_color)} rg {_rgb(stroke_color)} RG "
+            f"{_pdf_num(x)} {_pdf_num(y)} {_pdf_num(width)} {_pdf_num(height)} re B")
+
+
+def _line_ops(x1, y1, x2, y2, color, width):
+    return (f"{_pdf_num(width)} w {_rgb(color)} RG "
+            f"{_pdf_num(x1)} {_pdf_num(y1)} m {_pdf_num(x2)} {_pdf_num(y2)} l S")
+
+
+_RAW_OPS = {
+    'rectangle': _rectangle_ops,
+    'line': _line_ops,
+}
+
+
+def _content_stream(data):
+    stream = DecodedStreamObject()
+    stream.set_data(data)
+    # Streams must be indirect objects; with this set, PdfWriter gives the new
+    # stream an object number when it copies the page
+    stream.indirect_reference = None
+    return stream
+
+
+def _raw_ops(ops):
+    """PDF operators for a page's queued rectangle/line operations"""
+    return '\n'.join(_RAW_OPS[kind](*args) for kind, args in ops)
+
+
+def _append_content(page, data):
+    """Append PDF operators to a page's content streams"""
+    # Keep the page's existing streams as they are, bracketed with q/Q so graphics
+    # state they leave behind (e.g. a transformation) doesn't affect the new operators
+    contents = page.raw_get('/Contents') if '/Contents' in page else None
+    if contents is None:
+        streams = []
+    elif isinstance(contents.get_object(), ArrayObject):
+        streams = list(contents.get_object())
+    else:
+        streams = [contents]
+    page[NameObject('/Contents')] = ArrayObject(
+        [_content_stream(b'q\n'), *streams, _content_stream(f'\nQ\nq\n{data}\nQ\n'.encode('ascii'))])
+
+
+def _overlay_form(overlay_page, box):
+    """Turn a rendered overlay page into a Form XObject, returning its reference.
+
+    The form is the overlay's own content stream, still an indirect object of the
+    overlay's reader, so PdfWriter copies it once however many pages use it. Its
+    bounding box (which clips it) is the box of the pages it is drawn on, since the
+    edits are placed in their coordinates.
+    """
+    contents = overlay_page.raw_get('/Contents')
+    contents.get_object().update({
+        NameObject('/Type'): NameObject('/XObject'),
+        NameObject('/Subtype'): NameObject('/Form'),
+        NameObject('/BBox'): RectangleObject(box),
+        NameObject('/Resources'): overlay_page.raw_get('/Resources'),
+    })
+    return contents
+
+
+def _box_size(box):
+    """(width, height) of a (left, bottom, right, top) box"""
+    left, bottom, right, top = box
+    return right - left, top - bottom
+
+
+def _add_xobject(page, name, ref):
+    """Add an XObject to a page's resources (copied, as they may be shared with other pages)"""
+    resources = DictionaryObject(page['/Resources']) if '/Resources' in page else DictionaryObject()
+    xobjects = DictionaryObject(resources['/XObject']) if '/XObject' in resources else DictionaryObject()
+    xobjects[NameObject(name)] = ref
+    resources[NameObject('/XObject')] = xobjects
+    page[NameObject('/Resources')] = resources
+
+
+def _startxref(stream):
+    """Offset of a PDF's last cross-reference section if it is a plain xref table, else None.
+
+    None also covers a startxref that can't be found in the last 1 KB (e.g. junk
+    appended after %%EOF).
+    """
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(max(0, size - 1024))
+    tail = stream.read()
+    try:
+        start = tail.rindex(b'startxref') + len(b'startxref')
+        offset = int(tail[start:].split(b'%%EOF')[0].strip())
+    except ValueError:
+        return None
+    stream.seek(offset)
+    return offset if stream.read(4) == b'xref' else None
+
+
+def _check_pdf_file(pdf_path):
+    """Raise if a file is missing, empty, or has no PDF header"""
+    with open(pdf_path, 'rb') as f:
+        head = f.read(1024)
+    if not head:
+        raise EmptyFileError(f"Cannot read an empty file: {pdf_path}")
+    if b'%PDF-' not in head:
+        raise PdfReadError(f"Not a PDF file: {pdf_path}")
+
+
+class _IncrementalUpdate:
+    """Writes changed objects as a PDF incremental update, appended to a copy of the source.
+
+    Objects of the source keep their references; everything else they point to (new
+    content streams, overlay fonts and images) is written once under a new number.
+    """
+    
+    def __init__(self, reader):
+        self.reader = reader
+        self.next_num = reader.trailer['/Size']
+        self.numbers = {}
+        self.pending = []
+    
+    def _number(self, key, obj):
+        num = self.numbers.get(key)
+        if num is None:
+            num = self.numbers[key] = self.next_num
+            self.next_num += 1
+            self.pending.append((num, obj))
+        return IndirectObject(num, 0, None)
+    
+    def resolve(self, obj):
+        """Copy of obj fit for the update, with references renumbered as needed"""
+        if isinstance(obj, IndirectObject):
+            if obj.pdf is self.reader:
+                return obj
+            return self._number((id(obj.pdf), obj.idnum, obj.generation), obj.get_object())
+        if isinstance(obj, StreamObject):
+            # Streams can only be indirect objects
+            return self._number(id(obj), obj)
+        if isinstance(obj, DictionaryObject):
+            return DictionaryObject({key: self.resolve(value) for key, value in obj.items()})
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(self.resolve(value) for value in obj)
+        return obj
+    
+    def _stream(self, obj):
+        if isinstance(obj, EncodedStreamObject):
+            stream = EncodedStreamObject()
+            stream._data = obj._data
+        else:
+            # New content is compressed like the rest of the file
+            decoded = DecodedStreamObject()
+            decoded.set_data(obj._data)
+            stream = decoded.flate_encode()
+        for key, value in obj.items():
+            if key not in stream and key != '/Length':
+                stream[key] = self.resolve(value)
+        return stream
+    
+    def write(self, output, pages, prev):
+        """Append the given (changed) source pages and what they reference to output"""
+        offsets = {}
+        
+        def write_object(num, generation, obj):
+            offsets[num] = (output.tell(), generation)
+            output.write(f'{num} {generation} obj\n'.encode('ascii'))
+            obj.write_to_stream(output, None)
+            output.write(b'\nendobj\n')
+        
+        output.write(b'\n')
+        for page in pages:
+            ref = page.indirect_reference
+            write_object(ref.idnum, ref.generation, self.resolve(page))
+        while self.pending:
+            num, obj = self.pending.pop()
+            write_object(num, 0, self._stream(obj) if isinstance(obj, StreamObject) else self.resolve(obj))
+        
+        # Cross-reference section: the head of the free list, then the written
+        # objects in runs of consecutive numbers
+        xref = output.tell()
+        output.write(b'xref\n0 1\n0000000000 65535 f \n')
+        nums = sorted(offsets)
+        start = 0
+        for i in range(1, len(nums) + 1):
+            if i == len(nums) or nums[i] != nums[i - 1] + 1:
+                output.write(f'{nums[start]} {i - start}\n'.encode('ascii'))
+                for num in nums[start:i]:
+                    output.write('%010d %05d n \n'.encode('ascii') % offsets[num])
+                start = i
+        
+        trailer = DictionaryObject({NameObject(key): value for key, value in self.reader.trailer.items()
+                                    if key in ('/Root', '/Info', '/ID')})
+        trailer[NameObject('/Size')] = NumberObject(self.next_num)
+        trailer[NameObject('/Prev')] = NumberObject(prev)
+        output.write(b'trailer\n')
+        trailer.write_to_stream(output, None)
+        output.write(f'\nstartxref\n{xref}\n%%EOF\n'.encode('ascii'))
+
 
 class PDFEditor:
-    def __init__(self, pdf_path):
-        """Initialize PDF editor with a PDF file"""
+    """Queue edits to a PDF and write the result with save().
+
+    The source file is memory-mapped while the editor works on it; use the editor
+    as a context manager (or call close()) to release it when done.
+    """
+    
+    def __init__(self, pdf_path, threads=None):
+        """Initialize PDF editor with a PDF file (threads: overlay rendering workers)"""
+        # The source file's memory map, created with the reader on first use
+        self._mmap = None
         self.pdf_path = pdf_path
-        self.reader = PdfReader(pdf_path)
+        self.threads = threads or min(8, os.cpu_count() or 1)
         self.writer = PdfWriter()
-        self.num_pages = len(self.reader.pages)
+        # Edits are queued and applied by save(): drawing operations per page (drawn
+        # onto a single overlay per page), deleted pages, and paths of PDFs to append
+        self._ops = defaultdict(list)
+        self._deleted = set()
+        self._merged = []
+        # Pages whose objects differ from the source (drawn on or rotated)
+        self._dirty_pages = set()
+        # Extracted text per page, until an edit is applied to the page
+        self._text_cache = {}
+        # Number of shared overlay forms created, for unique resource names
+        self._forms = 0
         
+    @cached_property
+    def reader(self):
+        """Reader for the source PDF, created on first use.
+
+        A file is memory-mapped rather than read into a bytes object, so only the
+        parts PyPDF2 actually seeks to (xref, trailer, touched pages) are loaded.
+        """
+        if self._is_source_file() and os.path.getsize(self.pdf_path) > 0:
+            # The map keeps its own handle to the file, so the file object isn't kept open
+            with open(self.pdf_path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return PdfReader(self._mmap)
+        # File objects, and empty files (which PdfReader reports as such)
+        return PdfReader(self.pdf_path)
+    
+    def _is_source_file(self):
+        """Whether the source was given as a file path (rather than a file object)"""
+        return isinstance(self.pdf_path, (str, os.PathLike))
+    
+    @cached_property
+    def _pages(self):
+        """The source PDF's pages as a plain list, for cheap repeated indexing"""
+        return list(self.reader.pages)
+    
+    @cached_property
+    def num_pages(self):
+        """Number of pages in the source PDF"""
+        return len(self._pages)
+    
+    def close(self):
+        """Release the memory-mapped source file (the reader can't be used afterwards)"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def __del__(self):
+        # Editors dropped without close() shouldn't keep the file mapped (which
+        # blocks deleting or replacing it on Windows). The caller may still hold
+        # the reader, so it is switched to an in-memory copy rather than closed
+        self._release_source()
+    
+    def _release_source(self):
+        """Copy the mapped source into memory and unmap it, so the file can be overwritten"""
+        if self._mmap is not None:
+            self.reader.stream = BytesIO(self._mmap[:])
+            self.close()
+    
     def get_page_count(self):
         """Get total number of pages"""
         return self.num_pages
     
-    def add_text(self, page_num, text, x, y, font_size=12, color="#000000", font_name="Helvetica"):
-        """Add text to a specific page"""
-        # Create overlay with text
-        packet = BytesIO()
-        can = canvas.Canvas(packet, pagesize=A4)
-        
-        # Set font and color
-        can.setFont(font_name, font_size)
-        can.setFillColor(HexColor(color))
-        
-        # Draw text
-        can.drawString(x, y, text)
-        can.save()
-        
-        # Merge with existing page
-        packet.seek(0)
-        overlay = PdfReader(packet)
-        page = self.reader.pages[page_num]
-        page.merge_page(overlay.pages[0])
-        self.writer.add_page(page)
-        
+    def _page_index(self, page_num):
+        """Check a page number (negative numbers count from the end) and return its index"""
+        if not -self.num_pages <= page_num < self.num_pages:
+            raise IndexError(f"Page {page_num} out of range (document has {self.num_pages} pages)")
+        return page_num % self.num_pages
+    
+    def add_text(self, page_num, text, x, y, font_size=12, color="#000000", font_name="Helvetica", font_path=None):
+        """Add text to a specific page (font_path: TrueType file for a non-standard font)"""
+        _ensure_font(font_name, font_path)
+        # Raises KeyError for an unknown font here rather than when the page is drawn
+        pdfmetrics.getFont(font_name)
+        page_num = self._page_index(page_num)
+        self._dirty_pages.add(page_num)
+        self._ops[page_num].append(
+            ('text', (text, x, y, font_size, _hex(color), font_name)))
         return True
     
     def add_image(self, page_num, image_path, x, y, width, height):
         """Add image to a specific page"""
-        packet = BytesIO()
-        can = canvas.Canvas(packet, pagesize=A4)
-        
-        # Draw image
-        can.drawImage(image_path, x, y, width=width, height=height)
-        can.save()
-        
-        # Merge with existing page
-        packet.seek(0)
-        overlay = PdfReader(packet)
-        page = self.reader.pages[page_num]
-        page.merge_page(overlay.pages[0])
-        self.writer.add_page(page)
-        
+        page_num = self._page_index(page_num)
+        # Check the image can be read now rather than when the page is drawn
+        if isinstance(image_path, (str, os.PathLike)) and os.path.isfile(image_path):
+            _check_image(os.fspath(image_path), os.stat(image_path).st_mtime_ns)
+        elif not isinstance(image_path, ImageReader):
+            # URLs and file objects are opened now, as drawImage would (a file
+            # object can only be read once)
+            image_path = ImageReader(image_path)
+        self._dirty_pages.add(page_num)
+        self._ops[page_num].append(
+            ('image', (image_path, x, y, width, height)))
         return True
     
     def add_rectangle(self, page_num, x, y, width, height, fill_color="#ffffff", stroke_color="#000000", stroke_width=1):
         """Add rectangle to a specific page"""
-        packet = BytesIO()
-        can = canvas.Canvas(packet, pagesize=A4)
-        
-        # Set colors
-        can.setFillColor(HexColor(fill_color))
-        can.setStrokeColor(HexColor(stroke_color))
-        can.setLineWidth(stroke_width)
-        
-        # Draw rectangle
-        can.rect(x, y, width, height, fill=1, stroke=1)
-        can.save()
-        
-        # Merge with existing page
-        packet.seek(0)
-        overlay = PdfReader(packet)
-        page = self.reader.pages[page_num]
-        page.merge_page(overlay.pages[0])
-        self.writer.add_page(page)
-        
+        page_num = self._page_index(page_num)
+        self._dirty_pages.add(page_num)
+        self._ops[page_num].append(
+            ('rectangle', (x, y, width, height, _hex(fill_color), _hex(stroke_color), stroke_width)))
         return True
     
     def add_line(self, page_num, x1, y1, x2, y2, color="#000000", width=1):
         """Add line to a specific page"""
-        packet = BytesIO()
-        can = canvas.Canvas(packet, pagesize=A4)
-        
-        # Set color and width
-        can.setStrokeColor(HexColor(color))
-        can.setLineWidth(width)
-        
-        # Draw line
-        can.line(x1, y1, x2, y2)
-        can.save()
-        
-        # Merge with existing page
-        packet.seek(0)
-        overlay = PdfReader(packet)
-        page = self.reader.pages[page_num]
-        page.merge_page(overlay.pages[0])
-        self.writer.add_page(page)
-        
+        page_num = self._page_index(page_num)
+        self._dirty_pages.add(page_num)
+        self._ops[page_num].append(
+            ('line', (x1, y1, x2, y2, _hex(color), width)))
         return True
     
     def rotate_page(self, page_num, angle):
         """Rotate a page by specified angle"""
-        page = self.reader.pages[page_num]
-        page.rotate(angle)
-        self.writer.add_page(page)
+        page_num = self._page_index(page_num)
+        self._pages[page_num].rotate(angle)
+        self._dirty_pages.add(page_num)
+        self._text_cache.pop(page_num, None)
         return True
     
     def delete_page(self, page_num):
         """Delete a specific page"""
-        for i in range(self.num_pages):
-            if i != page_num:
-                self.writer.add_page(self.reader.pages[i])
+        self._deleted.add(self._page_index(page_num))
         return True
     
     def extract_text(self, page_num):
         """Extract text from a specific page"""
-        page = self.reader.pages[page_num]
-        return page.extract_text()
+        page_num = self._page_index(page_num)
+        text = self._text_cache.get(page_num)
+        if text is None:
+            text = self._pages[page_num].extract_text()
+            self._text_cache[page_num] = text
+        return text
+    
+    def extract_all_text(self):
+        """Extract the text of every page, as a list indexed by page number"""
+        return [self.extract_text(page_num) for page_num in range(self.num_pages)]
+    
+    def _apply_overlays(self):
+        """Merge each page's queued drawing operations into it as a single overlay"""
+        # Pages with identical edits (e.g. the same stamp or logo on every page) and
+        # the same MediaBox (origin included, as edits are in page coordinates)
+        # share one overlay
+        shared = defaultdict(list)
+        for page_num, ops in self._ops.items():
+            if page_num in self._deleted:
+                continue
+            page = self._pages[page_num]
+            self._text_cache.pop(page_num, None)
+            if all(kind in _RAW_OPS for kind, _ in ops):
+                _append_content(page, _raw_ops(ops))
+            else:
+                box = page.mediabox
+                shared[(tuple(ops), (float(box.left), float(box.bottom), float(box.right), float(box.top)))].append(page_num)
+        jobs = [(page_nums, ops, box) for (ops, box), page_nums in shared.items()]
+        
+        # Pages' overlays are independent, so render them concurrently (zlib
+        # compression releases the GIL). map() hands them back in page order as they
+        # finish, so each is parsed and merged on this thread while later pages are
+        # still rendering
+        workers = min(self.threads, len(jobs))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                self._merge_overlays(jobs, executor.map(_render_overlay,
+                                                        [ops for _, ops, _ in jobs],
+                                                        [_box_size(box) for _, _, box in jobs]))
+        else:
+            self._merge_overlays(jobs, (_render_overlay(ops, _box_size(box)) for _, ops, box in jobs))
+        self._ops.clear()
+    
+    def _merge_overlays(self, jobs, overlays):
+        """Merge rendered overlay PDFs (in the same order as jobs) into their pages"""
+        for (page_nums, _, box), data in zip(jobs, overlays):
+            overlay = PdfReader(BytesIO(data)).pages[0]
+            if len(page_nums) == 1:
+                self._pages[page_nums[0]].merge_page(overlay)
+                continue
+            # Embed the overlay once as a Form XObject and draw it on each page with
+            # a single Do operator, rather than copying its content into every page
+            self._forms += 1
+            name = f'/EditorOverlay{self._forms}'
+            form = _overlay_form(overlay, box)
+            for page_num in page_nums:
+                page = self._pages[page_num]
+                _add_xobject(page, name, form)
+                _append_content(page, f'{name} Do')
+    
+    def save(self, output_path, backend="pypdf2"):
+        """Save the edited PDF (backend="pikepdf": serialize with qpdf, needs pikepdf)"""
+        if backend not in ("pypdf2", "pikepdf"):
+            raise ValueError(f"Unknown backend: {backend}")
+        if backend == "pikepdf" and not HAS_PIKEPDF:
+            raise ImportError("The pikepdf backend requires pikepdf to be installed")
+        self._write_output(output_path, self._save_pikepdf if backend == "pikepdf" else self._save_pypdf2)
+        return True
+    
+    def _write_output(self, output_path, write):
+        """Have write(path) produce the output in a temporary file, then swap it in.
+
+        output_path itself is only replaced once everything has been read and
+        written, so it may be the source or one of the merged PDFs, and a failed
+        save leaves the existing file intact.
+        """
+        output_path = os.fspath(output_path)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(output_path) or '.', suffix='.pdf.tmp')
+        os.close(fd)
+        try:
+            write(tmp_path)
+            # mkstemp creates the file private to its owner; give it the existing
+            # file's permissions, or those a newly created file would get
+            if os.path.exists(output_path):
+                shutil.copymode(output_path, tmp_path)
+            else:
+                os.chmod(tmp_path, 0o666 & ~_UMASK)
+            # Unmap the source before replacing it (a mapped file can't be replaced
+            # on Windows); the reader keeps working from an in-memory copy
+            if self._mmap is not None and os.path.exists(output_path) and os.path.samefile(output_path, self.pdf_path):
+                self._release_source()
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def _save_pypdf2(self, output_path):
+        # PyPDF2 writes every object in several small pieces; collect them in a
+        # large buffer instead of issuing a system call for each
+        with open(output_path, 'wb', buffering=1024 * 1024) as output_file:
+            self.save_to_stream(output_file)
     
-    def save(self, output_path):
-        """Save the edited PDF"""
-        with open(output_path, 'wb') as output_file:
-            self.writer.write(output_file)
+    def _save_pikepdf(self, output_path):
+        """Save with qpdf: the edited document as written by PyPDF2, or the merged PDFs"""
+        with ExitStack() as stack:
+            if self._merged:
+                # qpdf copies the merged pages' objects natively instead of PyPDF2's
+                # per-object clone; their files must stay open until the output is saved
+                pdf = stack.enter_context(pikepdf.Pdf.new())
+                for pdf_path in self._merged:
+                    pdf.pages.extend(stack.enter_context(pikepdf.Pdf.open(pdf_path)).pages)
+            else:
+                buf = BytesIO()
+                self._build_writer()
+                self.writer.write(buf)
+                buf.seek(0)
+                pdf = stack.enter_context(pikepdf.Pdf.open(buf))
+            pdf.save(output_path, linearize=True, compress_streams=True,
+                     stream_decode_level=pikepdf.StreamDecodeLevel.generalized)
+    
+    def save_to_stream(self, stream):
+        """Write the edited PDF to a binary stream (needs write() and tell())"""
+        self._build_writer()
+        self.writer.write(stream)
         return True
     
+    def _build_writer(self):
+        """Apply queued edits and assemble the output in a fresh writer"""
+        self.writer = PdfWriter()
+        if self._merged:
+            # After merge_pdfs() the output is just the merged PDFs, in order
+            self._check_no_edits()
+            for reader in self._merged_readers():
+                self.writer.append(reader)
+            return
+        
+        # Copy the kept pages in one pass (deletions collapse into a single page
+        # list, and outline entries and links to deleted pages are dropped)
+        self._apply_overlays()
+        kept = [i for i in range(self.num_pages) if i not in self._deleted]
+        self.writer.append(self.reader, pages=kept)
+    
+    def save_incremental(self, output_path):
+        """Save the edited PDF as an incremental update of the source.
+
+        The source is copied unchanged and only the edited pages and their new
+        content are appended, so stamping a few pages of a large document writes
+        kilobytes instead of rewriting every page. Falls back to save() when the
+        update wouldn't be small or can't be expressed as one: more than half the
+        pages edited, deleted or merged pages, encryption, a cross-reference stream
+        or unreadable startxref, a source given as a file object, or the output
+        being the source file itself.
+        """
+        if (self._deleted or self._merged or self.reader.is_encrypted
+                or len(self._dirty_pages) * 2 > self.num_pages
+                or not self._is_source_file()
+                or (os.path.exists(output_path) and os.path.samefile(output_path, self.pdf_path))):
+            return self.save(output_path)
+        prev = _startxref(self.reader.stream)
+        if prev is None:
+            return self.save(output_path)
+        
+        self._apply_overlays()
+        self._write_output(output_path, lambda path: self._append_update(path, prev))
+        return True
+    
+    def _append_update(self, output_path, prev):
+        """Copy the source to output_path and append the edited pages as an update"""
+        shutil.copyfile(self.pdf_path, output_path)
+        with open(output_path, 'r+b', buffering=1024 * 1024) as output_file:
+            output_file.seek(0, os.SEEK_END)
+            _IncrementalUpdate(self.reader).write(
+                output_file, [self._pages[i] for i in sorted(self._dirty_pages)], prev)
+    
     def merge_pdfs(self, pdf_paths):
-        """Merge multiple PDFs"""
+        """Merge multiple PDFs: save() writes the given files' pages, in order.
+
+        The output holds only these PDFs, not this document's own pages (include
+        its path to keep them). Edits to this document can't be combined with a
+        merge, so either raises ValueError if the other has been made. The files
+        are only checked to exist and look like PDFs here; they are parsed by
+        save(), so a damaged file is reported from there.
+        """
+        self._check_no_edits()
+        pdf_paths = list(pdf_paths)
         for pdf_path in pdf_paths:
-            reader = PdfReader(pdf_path)
-            for page in reader.pages:
-                self.writer.add_page(page)
+            _check_pdf_file(pdf_path)
+        self._merged.extend(pdf_paths)
         return True
+    
+    def _check_no_edits(self):
+        """Raise if this document has edits, which a merge would drop"""
+        if self._dirty_pages or self._deleted:
+            raise ValueError("merge_pdfs() replaces this document's pages, so its edits would be lost; "
+                             "save the edited document first and merge the saved file")
+    
+    def _merged_readers(self):
+        """Open the PDFs to merge, in order"""
+        # Opening a reader loads the whole file and parses its cross-reference
+        # table; overlap that for several files (the reads release the GIL)
+        workers = min(self.threads, len(self._merged))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(PdfReader, self._merged))
+        return [PdfReader(pdf_path) for pdf_path in self._merged]
+
+
+@lru_cache(maxsize=None)
+def _sample_styles():
+    """reportlab's sample stylesheet, built once (it creates dozens of ParagraphStyles)"""
+    from reportlab.lib.styles import getSampleStyleSheet
+    return getSampleStyleSheet()
 
 
 def create_pdf_from_html(html_content, output_path):
     """Create PDF from HTML content using reportlab"""
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet
-    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph
     
     doc = SimpleDocTemplate(output_path, pagesize=A4)
-    story = []
-    styles = getSampleStyleSheet()
     
     # Parse HTML and add to PDF
     # This is a simplified version - you can enhance with html2pdf libraries
-    para = Paragraph(html_content, styles['Normal'])
-    story.append(para)
-    
-    doc.build(story)
+    doc.build([Paragraph(html_content, _sample_styles()['Normal'])])
     return True
+
+
+def create_pdfs_from_html(items, threads=None):
+    """Create several PDFs from (html_content, output_path) pairs concurrently"""
+    items = list(items)
+    workers = min(threads or min(8, os.cpu_count() or 1), len(items))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(create_pdf_from_html, *zip(*items)))
+    return [create_pdf_from_html(html_content, output_path) for html_content, output_path in items]
@@ -0,0 +1,166 @@
+import os
+import re
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+from urllib.parse import unquote
+
+from jinja2 import DictLoader, Environment
+from openpyxl import Workbook, load_workbook
+
+import html_newsletter_generator_v2 as generator_module
+from html_newsletter_generator_v2 import HTMLNewsletterGenerator, _event_records
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+EVENT_COLUMNS = ['Event Title', 'Event Description', 'Event Date', 'Department/Section',
+                 'Image Reference', 'Event Type', 'Guest Speaker', 'Location', 'Coordinators']
+
+
+def stale_dimension_workbook(path, rows):
+    """Save an events sheet whose <dimension> claims only cell A1 is used"""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = 'Department Events'
+    sheet.append(EVENT_COLUMNS)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+    with zipfile.ZipFile(path) as archive:
+        members = {name: archive.read(name) for name in archive.namelist()}
+    sheet_xml = 'xl/worksheets/sheet1.xml'
+    members[sheet_xml] = re.sub(rb'<dimension ref="[^"]*"\s*/>', b'<dimension ref="A1"/>', members[sheet_xml])
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+
+
+class EventRecordsTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def read_events(self, rows):
+        path = os.path.join(self.tmp.name, 'events.xlsx')
+        stale_dimension_workbook(path, rows)
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            return _event_records(workbook['Department Events'])
+        finally:
+            workbook.close()
+
+    def test_stale_dimension_keeps_all_rows(self):
+        rows = [[f'Event {i}', 'About it', '2024-08-01', 'CSE'] for i in range(9)]
+        events = self.read_events(rows)
+        self.assertEqual([event['Event Title'] for event in events], [f'Event {i}' for i in range(9)])
+
+    def test_missing_value_strings_are_none(self):
+        events = self.read_events([
+            ['Talk', 'N/A', 'NULL', ' ', 'nan', None, 'None', 'Hall A', 'Dr. X'],
+            ['N/A', 'Skipped: no title'],
+        ])
+        self.assertEqual(len(events), 1)
+        event = events[0]
+        for column in ('Event Description', 'Event Date', 'Department/Section', 'Image Reference',
+                       'Event Type', 'Guest Speaker'):
+            self.assertIsNone(event[column], column)
+        self.assertEqual(event['Location'], 'Hall A')
+
+
+class LinkedImageTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        # Work in one folder, with the image in another that isn't below it
+        self.work = os.path.join(self.tmp.name, 'work')
+        os.makedirs(self.work)
+        self.image = os.path.join(self.tmp.name, 'shared images', 'front.png')
+        os.makedirs(os.path.dirname(self.image))
+        shutil.copy(os.path.join(REPO, 'static', '12.png'), self.image)
+        self.excel = shutil.copy(os.path.join(REPO, 'static', 'enhanced_newsletter_template.xlsx'), self.work)
+        cwd = os.getcwd()
+        os.chdir(self.work)
+        self.addCleanup(os.chdir, cwd)
+
+    def test_linked_image_resolves_from_html_file(self):
+        # The template's Front Image is 12.png, so image key '12' is the cover image
+        generator = HTMLNewsletterGenerator(self.excel, {'12': self.image}, 'linked', embed_images=False)
+        html_path = generator.generate()
+        with open(html_path, encoding='utf-8') as f:
+            html = f.read()
+
+        src = re.search(r'<img src="([^"]+)" alt="Main Image">', html).group(1)
+        self.assertFalse(src.startswith(('/', 'data:')), src)
+        linked = os.path.join(os.path.dirname(os.path.abspath(html_path)), unquote(src))
+        self.assertTrue(os.path.samefile(linked, self.image))
+
+
+class BytecodeCacheTests(unittest.TestCase):
+    def test_unwritable_cache_still_compiles(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = generator_module._BytecodeCache(directory)
+            env = Environment(loader=DictLoader({'page.html': 'Hello {{ name }}'}), bytecode_cache=cache)
+            with mock.patch('tempfile.NamedTemporaryFile', side_effect=PermissionError('read-only')):
+                template = env.get_template('page.html')
+            self.assertEqual(template.render(name='world'), 'Hello world')
+            self.assertEqual(os.listdir(directory), [])
+
+
+class GenerateTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.excel = shutil.copy(os.path.join(REPO, 'static', 'enhanced_newsletter_template.xlsx'), self.tmp.name)
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        self.addCleanup(generator_module._newsletter_css.cache_clear)
+        self.addCleanup(generator_module._template_digest.cache_clear)
+
+    def generate(self):
+        return HTMLNewsletterGenerator(self.excel, {}, 'session').generate()
+
+    def test_stylesheet_is_inlined(self):
+        with open(self.generate(), encoding='utf-8') as f:
+            html = f.read()
+        self.assertIn(f'<style>{generator_module._newsletter_css()}</style>', html)
+        self.assertNotIn('newsletter.css', html)
+
+    def mark_stale(self, html_path):
+        with open(html_path, 'w', encoding='utf-8') as f:
+            f.write('stale')
+
+    def read(self, html_path):
+        with open(html_path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_unchanged_inputs_reuse_the_rendered_file(self):
+        html_path = self.generate()
+        self.mark_stale(html_path)
+        self.assertEqual(self.generate(), html_path)
+        self.assertEqual(self.read(html_path), 'stale')
+
+    def test_template_change_rerenders(self):
+        html_path = self.generate()
+        self.mark_stale(html_path)
+        # As after upgrading to a build with a changed template
+        contact = generator_module._TEMPLATE_SOURCES['contact.html'] + '<!-- changed -->'
+        with mock.patch.dict(generator_module._TEMPLATE_SOURCES, {'contact.html': contact}):
+            generator_module._template_digest.cache_clear()
+            self.generate()
+        self.assertIn('<!DOCTYPE html>', self.read(html_path))
+
+    def test_missing_stylesheet_fails(self):
+        generator_module._newsletter_css.cache_clear()
+        missing = os.path.join(self.tmp.name, 'missing.css')
+        with mock.patch.object(generator_module, '_CSS_SOURCE_PATH', missing):
+            with self.assertRaisesRegex(Exception, 'missing.css'):
+                self.generate()
+
+
+if __name__ == '__main__':
+    unittest.main()
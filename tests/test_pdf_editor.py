@@ -0,0 +1,370 @@
+import os
+import pathlib
+import tempfile
+import unittest
+from io import BytesIO
+
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.errors import EmptyFileError
+from PyPDF2.generic import RectangleObject
+from PIL import Image
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from pdf_editor_backend import PDFEditor
+
+
+def make_pdf(path, pages, label='page'):
+    """Write a PDF whose pages read "<label> 1", "<label> 2", ..."""
+    can = canvas.Canvas(path, pagesize=A4)
+    for number in range(1, pages + 1):
+        can.drawString(72, 720, f'{label} {number}')
+        can.showPage()
+    can.save()
+    return path
+
+
+def make_xref_stream_pdf(path, pages):
+    """Write a PDF (1.5) whose cross-reference section is a stream rather than a table"""
+    font = 3 + 2 * pages
+    kids = b' '.join(b'%d 0 R' % (3 + 2 * i) for i in range(pages))
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, pages),
+    ]
+    for number in range(1, pages + 1):
+        content = b'BT /F1 12 Tf 72 720 Td (page %d) Tj ET' % number
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents %d 0 R '
+                       b'/Resources << /Font << /F1 %d 0 R >> >> >>' % (len(objects) + 2, font))
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(content), content))
+    objects.append(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+
+    data = bytearray(b'%PDF-1.5\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    # Entries: type (1 byte), offset (4), generation (2); the stream lists itself too
+    offsets.append(len(data))
+    rows = b'\x00\x00\x00\x00\x00\xff\xff' + b''.join(b'\x01' + offset.to_bytes(4, 'big') + b'\x00\x00'
+                                                      for offset in offsets)
+    data += (b'%d 0 obj\n<< /Type /XRef /Size %d /W [1 4 2] /Root 1 0 R /Length %d >>\nstream\n'
+             % (len(offsets), len(offsets) + 1, len(rows)))
+    data += rows + b'\nendstream\nendobj\nstartxref\n%d\n%%%%EOF\n' % offsets[-1]
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def page_texts(path):
+    return [page.extract_text().strip() for page in PdfReader(path).pages]
+
+
+class SaveTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.source = make_pdf(os.path.join(self.tmp.name, 'source.pdf'), 3)
+
+    def test_save_over_source_without_edits(self):
+        with PDFEditor(self.source) as editor:
+            editor.save(self.source)
+        self.assertEqual(page_texts(self.source), ['page 1', 'page 2', 'page 3'])
+        self.assertEqual(os.listdir(self.tmp.name), ['source.pdf'])
+
+    def test_save_over_source_with_edits(self):
+        with PDFEditor(self.source) as editor:
+            editor.add_text(0, 'stamp', 72, 72)
+            editor.delete_page(1)
+            editor.save(self.source)
+        self.assertEqual(page_texts(self.source), ['page 1\nstamp', 'page 3'])
+
+    def test_save_to_path_object(self):
+        output = pathlib.Path(self.tmp.name) / 'out.pdf'
+        with PDFEditor(self.source) as editor:
+            editor.save(output)
+        self.assertEqual(page_texts(output), ['page 1', 'page 2', 'page 3'])
+
+    def test_save_leaves_other_tmp_files_alone(self):
+        output = os.path.join(self.tmp.name, 'out.pdf')
+        with open(output + '.tmp', 'w') as f:
+            f.write('keep me')
+        with PDFEditor(self.source) as editor:
+            editor.save(output)
+        with open(output + '.tmp') as f:
+            self.assertEqual(f.read(), 'keep me')
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['out.pdf', 'out.pdf.tmp', 'source.pdf'])
+
+    def test_save_over_merged_pdf(self):
+        merged = make_pdf(os.path.join(self.tmp.name, 'merged.pdf'), 2, label='merged')
+        with PDFEditor(self.source) as editor:
+            editor.merge_pdfs([merged])
+            editor.save(merged)
+        self.assertEqual(page_texts(merged), ['merged 1', 'merged 2'])
+
+    def test_merge_writes_only_the_merged_pdfs(self):
+        other = make_pdf(os.path.join(self.tmp.name, 'other.pdf'), 2, label='other')
+        output = os.path.join(self.tmp.name, 'out.pdf')
+        with PDFEditor(self.source) as editor:
+            editor.merge_pdfs([self.source, other])
+            editor.save(output)
+        self.assertEqual(page_texts(output), ['page 1', 'page 2', 'page 3', 'other 1', 'other 2'])
+
+    def test_merge_after_edits_raises(self):
+        with PDFEditor(self.source) as editor:
+            editor.add_text(0, 'LOST', 72, 72)
+            with self.assertRaises(ValueError):
+                editor.merge_pdfs([self.source])
+
+    def test_edits_after_merge_raise_on_save(self):
+        output = os.path.join(self.tmp.name, 'out.pdf')
+        with PDFEditor(self.source) as editor:
+            editor.merge_pdfs([self.source])
+            editor.delete_page(0)
+            with self.assertRaises(ValueError):
+                editor.save(output)
+        self.assertFalse(os.path.exists(output))
+
+    def test_merge_checks_paths_up_front(self):
+        empty = os.path.join(self.tmp.name, 'empty.pdf')
+        open(empty, 'wb').close()
+        with PDFEditor(self.source) as editor:
+            with self.assertRaises(FileNotFoundError):
+                editor.merge_pdfs([os.path.join(self.tmp.name, 'missing.pdf')])
+            with self.assertRaises(EmptyFileError):
+                editor.merge_pdfs([empty])
+
+
+class SharedOverlayTests(unittest.TestCase):
+    BOX = [100, 100, 695, 942]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.source = os.path.join(self.tmp.name, 'source.pdf')
+        self.output = os.path.join(self.tmp.name, 'out.pdf')
+
+    def write_source(self, boxes):
+        writer = PdfWriter()
+        for page, box in zip(PdfReader(make_pdf(self.source, len(boxes))).pages, boxes):
+            page.mediabox = RectangleObject(box)
+            writer.add_page(page)
+        with open(self.source, 'wb') as f:
+            writer.write(f)
+
+    def test_pages_share_one_form_clipped_to_their_box(self):
+        # Pages whose MediaBox doesn't start at the origin
+        self.write_source([self.BOX] * 3)
+        with PDFEditor(self.source) as editor:
+            for page_num in range(3):
+                # Beyond [0 0 595 842], inside the page's box
+                editor.add_text(page_num, 'corner', 620, 900)
+            editor.save(self.output)
+
+        pages = PdfReader(self.output).pages
+        forms = [page['/Resources']['/XObject'].raw_get('/EditorOverlay1') for page in pages]
+        self.assertEqual(len({form.idnum for form in forms}), 1)
+        form = forms[0].get_object()
+        self.assertEqual([float(n) for n in form['/BBox']], self.BOX)
+        self.assertIn(b'(corner) Tj', form.get_data())
+
+    def test_other_origin_gets_its_own_overlay(self):
+        self.write_source([self.BOX, self.BOX, [0, 0, 595, 842]])
+        with PDFEditor(self.source) as editor:
+            for page_num in range(3):
+                editor.add_text(page_num, 'corner', 120, 120)
+            editor.save(self.output)
+
+        pages = PdfReader(self.output).pages
+        self.assertNotIn('/XObject', pages[2]['/Resources'])
+        self.assertEqual(page_texts(self.output)[2], 'page 3\ncorner')
+
+
+class IncrementalSaveTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.source = make_pdf(os.path.join(self.tmp.name, 'source.pdf'), 4)
+        self.output = os.path.join(self.tmp.name, 'out.pdf')
+
+    def read_bytes(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def save_incremental(self, editor):
+        with editor:
+            editor.save_incremental(self.output)
+        return self.read_bytes(self.output)
+
+    def test_update_is_appended_to_the_source(self):
+        editor = PDFEditor(self.source)
+        # The same stamp on two pages goes through a shared overlay form
+        editor.add_text(0, 'stamp', 72, 72)
+        editor.add_text(1, 'stamp', 72, 72)
+        output = self.save_incremental(editor)
+
+        self.assertTrue(output.startswith(self.read_bytes(self.source)))
+        reader = PdfReader(self.output, strict=True)
+        self.assertEqual([page.extract_text().strip() for page in reader.pages],
+                         ['page 1\nstamp', 'page 2\nstamp', 'page 3', 'page 4'])
+
+    def assert_full_save(self, editor, source=None):
+        output = self.save_incremental(editor)
+        self.assertFalse(output.startswith(self.read_bytes(source or self.source)))
+        PdfReader(self.output, strict=True)
+
+    def test_deleted_page_falls_back(self):
+        editor = PDFEditor(self.source)
+        editor.delete_page(3)
+        self.assert_full_save(editor)
+        self.assertEqual(len(page_texts(self.output)), 3)
+
+    def test_merge_falls_back(self):
+        editor = PDFEditor(self.source)
+        editor.merge_pdfs([self.source])
+        self.assert_full_save(editor)
+
+    def test_mostly_edited_document_falls_back(self):
+        editor = PDFEditor(self.source)
+        for page_num in range(3):
+            editor.add_line(page_num, 0, 0, 100, 100)
+        self.assert_full_save(editor)
+
+    def test_xref_stream_source_falls_back(self):
+        source = make_xref_stream_pdf(os.path.join(self.tmp.name, 'xref_stream.pdf'), 3)
+        editor = PDFEditor(source)
+        editor.add_text(0, 'stamp', 72, 72)
+        self.assert_full_save(editor, source)
+        self.assertEqual(page_texts(self.output), ['page 1\nstamp', 'page 2', 'page 3'])
+
+    def test_trailing_junk_falls_back(self):
+        with open(self.source, 'ab') as f:
+            f.write(b'\n' + b'x' * 2000 + b'\n')
+        editor = PDFEditor(self.source)
+        editor.add_text(0, 'stamp', 72, 72)
+        self.assert_full_save(editor)
+        self.assertEqual(page_texts(self.output)[0], 'page 1\nstamp')
+
+
+class ImageTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.source = make_pdf(os.path.join(self.tmp.name, 'source.pdf'), 1)
+        self.output = os.path.join(self.tmp.name, 'out.pdf')
+        self.image = os.path.join(self.tmp.name, 'photo.png')
+        Image.new('RGB', (800, 600), (10, 120, 200)).save(self.image)
+
+    def saved_image_sizes(self):
+        xobjects = PdfReader(self.output).pages[0]['/Resources']['/XObject']
+        return [(xobject.get_object()['/Width'], xobject.get_object()['/Height']) for xobject in xobjects.values()]
+
+    def test_large_image_is_downscaled(self):
+        with PDFEditor(self.source) as editor:
+            editor.add_image(0, self.image, 72, 72, 100, 75)
+            editor.save(self.output)
+        self.assertEqual(self.saved_image_sizes(), [(200, 150)])
+
+    def test_natural_size_image(self):
+        with PDFEditor(self.source) as editor:
+            editor.add_image(0, self.image, 72, 72, None, None)
+            editor.save(self.output)
+        self.assertEqual(self.saved_image_sizes(), [(800, 600)])
+
+    def test_image_reader_source(self):
+        with open(self.image, 'rb') as f:
+            reader = ImageReader(BytesIO(f.read()))
+        with PDFEditor(self.source) as editor:
+            editor.add_image(0, reader, 72, 72, 100, 75)
+            editor.save(self.output)
+        self.assertEqual(self.saved_image_sizes(), [(800, 600)])
+
+
+class ValidationTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.source = make_pdf(os.path.join(self.tmp.name, 'source.pdf'), 1)
+        self.output = os.path.join(self.tmp.name, 'out.pdf')
+
+    def test_unknown_font_fails_at_add_text(self):
+        with PDFEditor(self.source) as editor:
+            with self.assertRaises(KeyError):
+                editor.add_text(0, 'text', 72, 72, font_name='NoSuchFont')
+            # Nothing was queued, so the document still saves
+            editor.save(self.output)
+        self.assertEqual(page_texts(self.output), ['page 1'])
+
+    def test_unreadable_image_fails_at_add_image(self):
+        not_an_image = os.path.join(self.tmp.name, 'notes.png')
+        with open(not_an_image, 'w') as f:
+            f.write('not an image')
+        with PDFEditor(self.source) as editor:
+            with self.assertRaises(OSError):
+                editor.add_image(0, os.path.join(self.tmp.name, 'missing.png'), 72, 72, 10, 10)
+            with self.assertRaises(OSError):
+                editor.add_image(0, not_an_image, 72, 72, 10, 10)
+            editor.save(self.output)
+        self.assertEqual(page_texts(self.output), ['page 1'])
+
+
+class SourceTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.source = make_pdf(os.path.join(self.tmp.name, 'source.pdf'), 3)
+
+    def test_file_object_source(self):
+        with open(self.source, 'rb') as f:
+            editor = PDFEditor(BytesIO(f.read()))
+        output = os.path.join(self.tmp.name, 'out.pdf')
+        with editor:
+            editor.add_text(0, 'stamp', 72, 72)
+            editor.save(output)
+        self.assertEqual(page_texts(output), ['page 1\nstamp', 'page 2', 'page 3'])
+
+    def test_empty_file_source(self):
+        empty = os.path.join(self.tmp.name, 'empty.pdf')
+        open(empty, 'wb').close()
+        with self.assertRaises(EmptyFileError):
+            PDFEditor(empty).get_page_count()
+
+    def test_reader_outlives_dropped_editor(self):
+        reader = PDFEditor(self.source).reader
+        self.assertEqual(reader.pages[2].extract_text().strip(), 'page 3')
+
+
+@unittest.skipUnless(os.path.exists('/proc/self/maps'), 'needs /proc to inspect mappings')
+class ReleaseTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.source = make_pdf(os.path.join(self.tmp.name, 'source.pdf'), 1)
+
+    def is_mapped(self):
+        with open('/proc/self/maps') as f:
+            return self.source in f.read()
+
+    def open_fds(self):
+        return {os.readlink(f'/proc/self/fd/{fd}') for fd in os.listdir('/proc/self/fd')
+                if os.path.exists(f'/proc/self/fd/{fd}')}
+
+    def test_close_releases_source(self):
+        with PDFEditor(self.source) as editor:
+            editor.get_page_count()
+            self.assertTrue(self.is_mapped())
+        self.assertFalse(self.is_mapped())
+        self.assertNotIn(self.source, self.open_fds())
+
+    def test_dropped_editor_releases_source(self):
+        editor = PDFEditor(self.source)
+        editor.extract_text(0)
+        # Without waiting for the cycle collector (PyPDF2's objects refer back to their reader)
+        del editor
+        self.assertFalse(self.is_mapped())
+        self.assertNotIn(self.source, self.open_fds())
+
+
+if __name__ == '__main__':
+    unittest.main()